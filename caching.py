@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Parquet result cache shared by preprocessing.py and main.py.
+-------------------------------------------------------------
+Frames are stored as <cache_dir>/<name>.parquet; main.py keys its cache
+directories by files_digest and prunes the ones that went unused.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import time
+from importlib import metadata
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import pandas as pd
+
+
+def files_digest(*paths: str, extra: str = "") -> str:
+    """Content hash of the given files (plus an extra key string)."""
+    h = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    h.update(extra.encode())
+    return h.hexdigest()
+
+
+def library_versions(*dists: str) -> str:
+    """Key string "name=version;..." for the given distributions ("-" when not installed)."""
+    out = []
+    for dist in dists:
+        try:
+            out.append(f"{dist}={metadata.version(dist)}")
+        except metadata.PackageNotFoundError:
+            out.append(f"{dist}=-")
+    return ";".join(out)
+
+
+# Cache key directories (files_digest hex names) unused for this long are deleted
+CACHE_MAX_AGE_DAYS = 30
+_KEY_DIR_RE = re.compile(r"[0-9a-f]{32}")
+
+
+def prune_cache(root: Path, keep: Iterable[Path], max_age_days: float = CACHE_MAX_AGE_DAYS) -> None:
+    """Mark the keep directories as used now and delete key directories unused for max_age_days."""
+    keep = set(keep)
+    for d in keep:
+        if d.is_dir():
+            os.utime(d)  # a run that only reads the cache doesn't update the mtime itself
+    if not root.is_dir():
+        return
+    cutoff = time.time() - max_age_days * 86400
+    for d in root.iterdir():
+        if (d not in keep and _KEY_DIR_RE.fullmatch(d.name) and d.is_dir()
+                and d.stat().st_mtime < cutoff):
+            shutil.rmtree(d, ignore_errors=True)
+
+
+def cached(cache_dir: Optional[Path], name: str, build: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    """Load cache_dir/name.parquet if present, else build the frame and store it there."""
+    if cache_dir is None:
+        return build()
+    path = cache_dir / f"{name}.parquet"
+    try:
+        if path.exists():
+            return pd.read_parquet(path)
+    except (ImportError, OSError, ValueError):
+        pass  # unreadable cache entry: rebuild it
+    df = build()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(path, index=False)
+    except (ImportError, OSError, ValueError):
+        pass  # caching is best effort (e.g. no parquet engine installed)
+    return df
@@ -4,18 +4,56 @@
 """
 Main Pipeline: Specialty → NUCC Taxonomy Mapper
 ------------------------------------------------
-Steps:
+Steps (per chunk of input rows, so memory stays bounded):
 1. Preprocess raw specialties → (processed, is_junk)
 2. Map processed specialties → NUCC taxonomy codes (skip junk)
-3. Merge and write final CSV
+3. Merge and append to the final CSV
 """
 
 import argparse
 from pathlib import Path
 import pandas as pd
 
-from preprocessing import PreprocessSpecialty, load_synonyms
-from mapping import NuccSpecialtyMapper
+import mapping
+import preprocessing
+from caching import CACHE_MAX_AGE_DAYS, cached, files_digest, library_versions, prune_cache
+from preprocessing import CSV_ENGINE, STRING_DTYPE, PreprocessSpecialty, detect_input_column, load_synonyms
+from mapping import NUCC_COLUMNS, NuccSpecialtyMapper
+
+
+def join_distinct(df: pd.DataFrame, col: str, sep: str, key: str = "raw_specialty") -> pd.Series:
+    """Per key, the distinct values of col joined with sep in row order."""
+    d = df.drop_duplicates([key, col])
+    multi = d[key].duplicated(keep=False)
+    # Most keys have a single distinct value: only the rest need a Python-level join
+    single = d.loc[~multi].set_index(key)[col]
+    joined = d.loc[multi].groupby(key)[col].agg(sep.join)
+    return pd.concat([single, joined])
+
+
+def map_chunk(mapper: NuccSpecialtyMapper, df_pre: pd.DataFrame, n_jobs: int = 1) -> pd.DataFrame:
+    """Map one chunk of preprocessed rows and merge the codes back onto it."""
+    # --- Step 2: NUCC Mapping (skipping junk) ---
+    df_map_input = df_pre[df_pre["is_junk"] == 0].copy()
+    df_map = mapper.map_dataframe(df_map_input, col="processed", n_jobs=n_jobs)
+
+    # --- Step 2.5: Handle duplicate raw_specialty entries safely ---
+    if df_map["raw_specialty"].duplicated().any():
+        codes = join_distinct(df_map.sort_values("mapped_code"), "mapped_code", "|")
+        # Rounded like map_dataframe's, so the float noise of the mean can't depend on --chunksize
+        conf = df_map.groupby("raw_specialty")["confidence"].mean().map(lambda c: round(c, 3))
+        expl = join_distinct(df_map, "explain", "; ").str.slice(0, 250)
+        df_map = pd.concat([codes, conf, expl], axis=1).rename_axis("raw_specialty").reset_index()
+
+    # --- Step 3: Attach results to every row (raw_specialty is unique in df_map now) ---
+    mapped = df_map.set_index("raw_specialty").reindex(df_pre["raw_specialty"])
+
+    # Fill missing mappings for junk specialties
+    return df_pre.reset_index(drop=True).assign(
+        nucc_codes=mapped["mapped_code"].fillna("JUNK").to_numpy(),
+        confidence=mapped["confidence"].fillna(0.0).to_numpy(),
+        explain=mapped["explain"].fillna("junk-flagged").to_numpy(),
+    )
 
 
 def main():
@@ -24,63 +62,55 @@ def main():
     ap.add_argument("--nucc", required=True, help="NUCC taxonomy CSV (with code/classification...)")
     ap.add_argument("--synonyms", required=True, help="Synonyms CSV (type,pattern,replacement)")
     ap.add_argument("--out", required=True, help="Output mapped CSV")
+    ap.add_argument("--chunksize", type=int, default=50_000, help="Input rows processed per chunk")
+    ap.add_argument("--jobs", type=int, default=1, help="Worker processes for preprocessing and mapping (-1 = all cores)")
+    ap.add_argument("--cache-dir", default="~/.cache/specialty", help=f"Where per-chunk results are cached (one directory per key; "
+                    f"directories unused for {CACHE_MAX_AGE_DAYS} days are removed)")
+    ap.add_argument("--no-cache", action="store_true", help="Always recompute, don't read or write the cache")
     args = ap.parse_args()
 
-    # --- Step 1: Preprocessing ---
     print("🔹 Loading synonyms...")
     syn_map = load_synonyms(args.synonyms)
     pre = PreprocessSpecialty(synonyms_map=syn_map)
 
-    print("🔹 Reading input specialties...")
-    df_in = pd.read_csv(args.input)
-    df_pre = pre.process_dataframe(df_in)
-    print(f"✅ Preprocessed {len(df_pre)} specialties")
-
-    # --- Step 2: NUCC Mapping ---
     print("🔹 Loading NUCC taxonomy...")
-    nucc_df = pd.read_csv(args.nucc)
+    nucc_cols = [c for c in pd.read_csv(args.nucc, nrows=0).columns if c.strip().lower() in NUCC_COLUMNS]
+    nucc_df = pd.read_csv(args.nucc, engine=CSV_ENGINE, usecols=nucc_cols)
     nucc_df.columns = [c.strip().lower() for c in nucc_df.columns]
+    # Built once so canonicals and the mapping cache are shared by all chunks
     mapper = NuccSpecialtyMapper(nucc_df, synonyms=syn_map)
 
-    print("🔹 Mapping specialties (skipping junk)...")
-    df_map_input = df_pre[df_pre["is_junk"] == 0].copy()
-    df_map = mapper.map_dataframe(df_map_input, col="processed")
-
-    # --- Step 2.5: Handle duplicate raw_specialty entries safely ---
-    if df_map["raw_specialty"].duplicated().any():
-        print("⚠️  Duplicates found in mapped data — aggregating results...")
-        df_map = (
-            df_map.groupby("raw_specialty", as_index=False)
-            .agg({
-                "mapped_code": lambda x: "|".join(sorted(set(x))),
-                "confidence": "mean",
-                "explain": lambda x: "; ".join(set(x))[:250],
-            })
-        )
-
-    # --- Step 3: Merge results ---
-    df_pre["__row_id__"] = range(len(df_pre))
-    df_final = (
-        df_pre
-        .merge(df_map, on="raw_specialty", how="left", sort=False)
-        .sort_values("__row_id__")
-        .drop(columns="__row_id__")
-        .reset_index(drop=True)
-    )
-
-    # Rename mapped_code → nucc_codes
-    df_final.rename(columns={"mapped_code": "nucc_codes"}, inplace=True)
-
-    # Fill missing mappings for junk specialties
-    df_final = df_final.assign(
-        nucc_codes=df_final["nucc_codes"].fillna("JUNK"),
-        confidence=df_final["confidence"].fillna(0.0),
-        explain=df_final["explain"].fillna("junk-flagged")
-    )
-
-    # --- Step 4: Save output ---
+    # Results are cached per chunk, keyed by the contents of every input, the
+    # pipeline code and the libraries it runs on (rapidfuzz vs difflib scores
+    # differ), so a rerun on unchanged inputs only reads parquet files
+    pre_cache = map_cache = None
+    if not args.no_cache:
+        root = Path(args.cache_dir).expanduser()
+        code = (preprocessing.__file__, mapping.__file__, __file__)
+        libs = (f"{preprocessing.backend_key()};rapidfuzz_backend={mapping.USE_RAPIDFUZZ};"
+                + library_versions("numpy", "rapidfuzz"))
+        pre_key = files_digest(args.input, args.synonyms, *code, extra=f"chunksize={args.chunksize};{libs}")
+        map_key = files_digest(args.input, args.synonyms, args.nucc, *code,
+                               extra=f"chunksize={args.chunksize};threshold={mapper.threshold};{libs}")
+        pre_cache, map_cache = root / pre_key, root / map_key
+        prune_cache(root, keep=(pre_cache, map_cache))
+
+    # --- Stream input → preprocess → map → append to output ---
+    # (the pyarrow engine cannot read in chunks, so the C engine is used here)
+    print("🔹 Mapping specialties chunk by chunk (skipping junk)...")
+    col = detect_input_column(pd.read_csv(args.input, nrows=0))
     Path(args.out).parent.mkdir(parents=True, exist_ok=True)
-    df_final.to_csv(args.out, index=False)
+    total = 0
+    chunks = pd.read_csv(args.input, usecols=[col], dtype={col: STRING_DTYPE}, chunksize=args.chunksize)
+    for i, chunk in enumerate(chunks):
+        def build():
+            df_pre = cached(pre_cache, f"pre-{i}", lambda: pre.process_dataframe(chunk, col_guess=col, n_jobs=args.jobs))
+            return map_chunk(mapper, df_pre, n_jobs=args.jobs)
+
+        df_final = cached(map_cache, f"map-{i}", build)
+        df_final.to_csv(args.out, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+        total += len(df_final)
+        print(f"✅ Processed {total} specialties")
 
     print(f"✅ Wrote final mapped file → {args.out}")
     print("📄 Columns: raw_specialty, processed, is_junk, nucc_codes, confidence, explain")
@@ -10,10 +10,15 @@ Maps raw specialty text to NUCC taxonomy codes using:
 Returns multiple codes if ambiguous; marks as JUNK if below threshold.
 """
 
+import os
 import re
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple
-from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from preprocessing import STRING_DTYPE
 
 try:
     from rapidfuzz import process, fuzz
@@ -22,21 +27,61 @@ except ImportError:
     from difflib import SequenceMatcher, get_close_matches
     USE_RAPIDFUZZ = False
 
+try:
+    from numba import njit
+    USE_NUMBA = True
+except ImportError:
+    USE_NUMBA = False
+
+
+# NUCC taxonomy columns the mapper reads (matched case-insensitively)
+NUCC_COLUMNS = ("code", "classification", "specialization", "display_name")
+
+
+_PUNCT_RE = re.compile(r"[^a-z0-9\s/&+,-]")
+_NOISE_RE = re.compile(r"\b(dept|department|clinic|division|program|service|center|centre|unit|office"
+                       r"|of|for|and|the)\b")
+_WS_RE = re.compile(r"\s+")
+_SPLIT_RE = re.compile(r"\s*[|,/;&+]\s*| and ")
+# _PUNCT_RE as a byte table for ASCII text: bytes.translate is one C table lookup per char
+_PUNCT_TABLE = bytes(0x20 if _PUNCT_RE.match(chr(c)) else c for c in range(256))
+
 
 def normalize(text: str) -> str:
     """Clean and lowercase input text."""
     if not isinstance(text, str):
         return ""
     text = text.lower()
-    text = re.sub(r"[^a-z0-9\s/&+,-]", " ", text)
-    text = re.sub(r"\b(dept|department|clinic|division|program|service|center|centre|unit|office)\b", " ", text)
-    text = re.sub(r"\b(of|for|and|the)\b", " ", text)
-    return re.sub(r"\s+", " ", text).strip()
+    if text.isascii():
+        text = text.encode("ascii").translate(_PUNCT_TABLE).decode("ascii")
+    else:
+        text = _PUNCT_RE.sub(" ", text)
+    text = _NOISE_RE.sub(" ", text)
+    return _WS_RE.sub(" ", text).strip()
+
+
+def normalize_series(s: pd.Series) -> pd.Series:
+    """
+    normalize() over a Series of strings, one regex pass per step for the whole column.
+
+    >>> s = pd.Series(["İnternal Medicine", "Dept. of CARDIOLOGY\u2003", "OB/GYN & ENT"], dtype=STRING_DTYPE)
+    >>> normalize_series(s).tolist() == [normalize(t) for t in s]
+    True
+    """
+    out = s.str.lower().str.replace(_PUNCT_RE.pattern, " ", regex=True)
+    out = out.str.replace(_NOISE_RE.pattern, " ", regex=True)
+    out = out.str.replace(_WS_RE.pattern, " ", regex=True).str.strip()
+    # Arrow's lower() differs from str.lower() outside ASCII ("İ" -> "i", not "i̇"),
+    # so non-ASCII rows go through normalize() itself
+    wide = s.str.contains(r"[^\x00-\x7f]", regex=True, na=False)
+    if wide.any():
+        out[wide] = s[wide].map(normalize).astype(out.dtype)
+    return out
 
 
 def split_specialties(text: str) -> List[str]:
     """Split multi-specialty string into individual specialties."""
-    parts = re.split(r"\s*[|,/;&+]\s*| and ", text)
+    parts = _SPLIT_RE.split(text)
     return [p.strip() for p in parts if p.strip()]
 
 
@@ -48,23 +93,94 @@ def token_overlap(a: str, b: str) -> float:
     return len(ta & tb) / len(ta | tb)
 
 
+def popcount_rows(masks: np.ndarray) -> np.ndarray:
+    """Number of set bits in each row of a 2-D uint64 bitset array."""
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+        return np.bitwise_count(masks).sum(axis=1)
+    return np.unpackbits(masks.view(np.uint8), axis=1).sum(axis=1)
+
+
+if USE_NUMBA:
+    @njit(cache=True)
+    def _popcount64(x):
+        # SWAR bit count of one uint64 word
+        x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+        x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+        x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+        return np.int64((x * np.uint64(0x0101010101010101)) >> np.uint64(56))
+
+    # Serial on purpose: a parallel=True kernel starts a threading layer in the
+    # parent, and the fork-based worker pools then hang (TBB) or break (OpenMP).
+    @njit(cache=True)
+    def jaccard_scores(q, oov, canon_masks, out):
+        """Jaccard of query bitset q (plus oov unseen tokens) against every row of canon_masks."""
+        for i in range(canon_masks.shape[0]):
+            inter = 0
+            union = oov
+            for j in range(q.shape[0]):
+                inter += _popcount64(q[j] & canon_masks[i, j])
+                union += _popcount64(q[j] | canon_masks[i, j])
+            out[i] = inter / union if union else 0.0
+
+
+# Per-process mapper used by map_many_parallel workers
+_worker_mapper: Optional["NuccSpecialtyMapper"] = None
+
+
+def _init_worker(mapper: "NuccSpecialtyMapper") -> None:
+    global _worker_mapper
+    _worker_mapper = mapper
+    # Parallelism comes from the processes; keep rapidfuzz single-threaded
+    _worker_mapper.workers = 1
+
+
+def _map_shard(texts: List[str]) -> Dict[str, Tuple[List[str], float, str]]:
+    return _worker_mapper.map_many(texts)
+
+
 class NuccSpecialtyMapper:
-    def __init__(self, nucc_df: pd.DataFrame, synonyms: Dict[str, str], threshold: float = 0.65):
+    def __init__(self, nucc_df: pd.DataFrame, synonyms: Dict[str, str], threshold: float = 0.65,
+                 workers: int = -1):
         """
         nucc_df columns: code, classification, specialization, display_name
         synonyms: mapping of abbreviations/synonyms to canonical forms
+        workers: threads used by rapidfuzz for batch scoring (-1 = all cores)
         """
-        self.df = nucc_df.copy()
         self.synonyms = {k.lower(): v.lower() for k, v in synonyms.items()}
         self.threshold = threshold
+        self.workers = workers
 
-        # Canonical phrase for each NUCC entry
-        self.df["canonical"] = self.df.apply(
-            lambda r: (r.get("display_name") or f"{r.get('classification','')} {r.get('specialization','')}").strip().lower(),
-            axis=1
-        )
-        self.df["canonical"] = self.df["canonical"].map(normalize)
-        self.canonicals = self.df["canonical"].tolist()
+        # Canonical phrase for each NUCC entry: display_name, else "classification specialization".
+        # Only plain lists/dicts are kept; the table itself isn't (nor pickled to workers).
+        blank = pd.Series("", index=nucc_df.index)
+        dn = nucc_df.get("display_name", blank)
+        fallback = (nucc_df.get("classification", blank).fillna("").astype(str) + " "
+                    + nucc_df.get("specialization", blank).fillna("").astype(str))
+        canonical = dn.where(dn.notna() & (dn != ""), fallback).astype(str)
+        self.canonicals: List[str] = canonical.str.strip().str.lower().map(normalize).tolist()
+        self.codes: List[str] = nucc_df["code"].tolist()
+        # canonical phrase -> codes sharing it, in table order
+        self.canonical_index: Dict[str, List[str]] = {}
+        for canon, code in zip(self.canonicals, self.codes):
+            self.canonical_index.setdefault(canon, []).append(code)
+
+        # Token bitsets (one bit per vocabulary token) for vectorized token_overlap
+        self.vocab: Dict[str, int] = {}
+        for canon in self.canonicals:
+            for tok in canon.split():
+                self.vocab.setdefault(tok, len(self.vocab))
+        # Inverted index token -> ids of canonicals containing it, for fuzzy candidate pruning
+        postings = defaultdict(list)
+        for i, canon in enumerate(self.canonicals):
+            for tok in set(canon.split()):
+                postings[tok].append(i)
+        id_dtype = np.uint16 if len(self.canonicals) <= 0xFFFF else np.uint32
+        self.inv: Dict[str, np.ndarray] = {t: np.asarray(ids, dtype=id_dtype) for t, ids in postings.items()}
+        self._mask_words = max(1, -(-len(self.vocab) // 64))
+        self.canon_masks = np.vstack([self.token_mask(c)[0] for c in self.canonicals]) \
+            if self.canonicals else np.zeros((0, self._mask_words), dtype=np.uint64)
+        # map_one results, keyed by text (see map_many)
+        self._cache: Dict[str, Tuple[List[str], float, str]] = {}
 
     def expand_synonyms(self, text: str) -> str:
         words = text.split()
@@ -72,43 +188,132 @@ class NuccSpecialtyMapper:
         return " ".join(expanded)
 
     def exact_match(self, query: str) -> List[Tuple[str, float, str]]:
-        hits = self.df[self.df["canonical"] == query]
-        return [(r.code, 1.0, "exact") for _, r in hits.iterrows()]
+        return [(c, 1.0, "exact") for c in self.canonical_index.get(query, ())]
+
+    def token_mask(self, text: str) -> Tuple[np.ndarray, int]:
+        """Bitset of the text's tokens over self.vocab, plus the count of out-of-vocabulary tokens."""
+        mask = np.zeros(self._mask_words, dtype=np.uint64)
+        oov = 0
+        for tok in set(text.split()):
+            i = self.vocab.get(tok)
+            if i is None:
+                oov += 1
+            else:
+                mask[i >> 6] |= np.uint64(1) << np.uint64(i & 63)
+        return mask, oov
 
     def token_match(self, query: str) -> List[Tuple[str, float, str]]:
+        q, oov = self.token_mask(query)
+        if USE_NUMBA:
+            scores = np.empty(len(self.canon_masks))
+            jaccard_scores(q, oov, self.canon_masks, scores)
+        else:
+            inter = popcount_rows(q & self.canon_masks)
+            # OOV query tokens never intersect but still count toward the union
+            union = popcount_rows(q | self.canon_masks) + oov
+            scores = np.divide(inter, union, out=np.zeros(len(union)), where=union > 0)
         res = []
-        for _, r in self.df.iterrows():
-            score = token_overlap(query, r["canonical"])
-            if score >= 0.7:
-                res.append((r.code, score, f"token_overlap:{score:.2f}"))
+        for i in np.flatnonzero(scores >= 0.7):
+            score = float(scores[i])
+            res.append((self.codes[i], score, f"token_overlap:{score:.2f}"))
         return res
 
     def fuzzy_match(self, query: str) -> List[Tuple[str, float, str]]:
-        res = []
-        if USE_RAPIDFUZZ:
-            matches = process.extract(query, self.canonicals, scorer=fuzz.token_sort_ratio, limit=10)
-            for phrase, score, _ in matches:
-                score_n = score / 100.0
-                if score_n >= 0.75 and token_overlap(query, phrase) > 0:
-                    code = self.df.loc[self.df["canonical"] == phrase, "code"].iloc[0]
-                    res.append((code, score_n, f"fuzzy:{score_n:.2f}"))
+        return self.fuzzy_match_many([query])[0]
 
-        else:
-            for _, r in self.df.iterrows():
-                score = SequenceMatcher(None, query, r["canonical"]).ratio()
-                if score >= 0.8:
-                    res.append((r.code, score, f"fuzzy:{score:.2f}"))
-        return res
+    def fuzzy_match_many(self, queries: List[str], block: int = 256) -> List[List[Tuple[str, float, str]]]:
+        """
+        Fuzzy-match a batch of queries. A fuzzy hit must share a token with the
+        query: each block of queries is scored in one cdist call against the
+        union of its candidates from the inverted index, and every query then
+        keeps only the scores of its own candidates.
+        """
+        if not USE_RAPIDFUZZ:
+            out = []
+            for query in queries:
+                res = []
+                for code, canon in zip(self.codes, self.canonicals):
+                    score = SequenceMatcher(None, query, canon).ratio()
+                    if score >= 0.8:
+                        res.append((code, score, f"fuzzy:{score:.2f}"))
+                out.append(res)
+            return out
+
+        out: List[List[Tuple[str, float, str]]] = []
+        for start in range(0, len(queries), block):
+            batch = queries[start:start + block]
+            res_batch: List[List[Tuple[str, float, str]]] = [[] for _ in batch]
+            out.extend(res_batch)
+            postings = [[self.inv[t] for t in set(query.split()) if t in self.inv] for query in batch]
+            sizes = [sum(map(len, p)) for p in postings]
+            if not sum(sizes):
+                continue
+            ids = np.concatenate([a for p in postings for a in p])
+            union = np.unique(ids)  # ascending = table order
+            own = np.zeros((len(batch), len(union)), dtype=bool)
+            own[np.repeat(np.arange(len(batch)), sizes), np.searchsorted(union, ids)] = True
+            scores = process.cdist(batch, [self.canonicals[i] for i in union], scorer=fuzz.token_sort_ratio,
+                                   score_cutoff=75, dtype=np.float64, workers=self.workers)
+            rows, cols = np.nonzero(own & (scores >= 75))
+            # Per query, best score first and ties in table order, at most 10 hits
+            # (the order process.extract(..., limit=10) gives)
+            for k in np.lexsort((cols, -scores[rows, cols], rows)):
+                res = res_batch[rows[k]]
+                if len(res) < 10:
+                    score_n = float(scores[rows[k], cols[k]]) / 100.0
+                    code = self.canonical_index[self.canonicals[union[cols[k]]]][0]
+                    res.append((code, score_n, f"fuzzy:{score_n:.2f}"))
+        return out
 
     def map_one(self, text: str) -> Tuple[List[str], float, str]:
-        q = normalize(self.expand_synonyms(text))
+        return self.map_many([text])[text]
+
+    def map_many(self, texts: Iterable[str]) -> Dict[str, Tuple[List[str], float, str]]:
+        """
+        Batch version of map_one. Uncached texts are fuzzy-scored together;
+        results are memoized per instance since mapping is a pure function of the text.
+        """
+        texts = list(dict.fromkeys(texts))
+        todo = [t for t in texts if t not in self._cache]
+        if todo:
+            queries = [normalize(self.expand_synonyms(t)) for t in todo]
+            distinct = list(dict.fromkeys(q for q in queries if q))
+            fuzzy = dict(zip(distinct, self.fuzzy_match_many(distinct)))
+            for t, q in zip(todo, queries):
+                self._cache[t] = self._select(q, fuzzy.get(q, []))
+        return {t: self._cache[t] for t in texts}
+
+    def map_many_parallel(self, texts: Iterable[str], n_jobs: int) -> None:
+        """
+        Fill the cache for texts using n_jobs worker processes (-1 = all cores).
+        Each worker receives one copy of the mapper and maps shards of the uncached texts.
+        """
+        todo = [t for t in dict.fromkeys(texts) if t not in self._cache]
+        if n_jobs < 0:
+            n_jobs = os.cpu_count() or 1
+        n_shards = min(len(todo), n_jobs * 4)
+        if n_jobs <= 1 or n_shards <= 1:
+            self.map_many(todo)
+            return
+        shards = [todo[i::n_shards] for i in range(n_shards)]
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(self,)) as pool:
+            for res in pool.map(_map_shard, shards):
+                self._cache.update(res)
+
+    def __getstate__(self):
+        # The cache is derived data; don't ship it to worker processes
+        state = self.__dict__.copy()
+        state["_cache"] = {}
+        return state
+
+    def _select(self, q: str, fuzzy: List[Tuple[str, float, str]]) -> Tuple[List[str], float, str]:
         if not q:
             return ([], 0.0, "empty")
 
         candidates = []
         candidates += self.exact_match(q)
         candidates += self.token_match(q)
-        candidates += self.fuzzy_match(q)
+        candidates += fuzzy
 
         if not candidates:
             return ([], 0.0, "no match")
@@ -127,10 +332,11 @@ class NuccSpecialtyMapper:
 
     def map_text(self, text: str) -> Tuple[List[str], float, str]:
         parts = split_specialties(normalize(text))
+        mapped = self.map_many(parts)
         all_codes = Counter()
         confs, reasons = [], []
         for p in parts:
-            codes, conf, why = self.map_one(p)
+            codes, conf, why = mapped[p]
             for c in codes:
                 all_codes[c] += 1
             confs.append(conf)
@@ -141,26 +347,57 @@ class NuccSpecialtyMapper:
         top_codes = [c for c, _ in all_codes.most_common(3)]
         return (top_codes, avg_conf, "; ".join(reasons))
 
-    def map_dataframe(self, df: pd.DataFrame, col: str = "raw_specialty") -> pd.DataFrame:
+    def map_dataframe(self, df: pd.DataFrame, col: str = "raw_specialty", n_jobs: int = 1) -> pd.DataFrame:
         """
         df: a DataFrame that must include a 'raw_specialty' column (original)
             and a column named by 'col' which is the processed text to map.
         col: column in df that contains processed text to map (default 'raw_specialty').
+        n_jobs: worker processes for the distinct texts (1 = in-process, -1 = all cores).
 
         Returns DataFrame with columns: raw_specialty, mapped_code, confidence, explain
         where raw_specialty is the original input (so it can be merged back easily).
         """
-        rows = []
-        # Expect df to have 'raw_specialty' (original) and 'col' (processed)
-        if "raw_specialty" in df.columns and col in df.columns and col != "raw_specialty":
-            iter_rows = zip(df["raw_specialty"].astype(str), df[col].astype(str))
-        else:
-            # Fallback: treat the passed column as both original and processed
-            iter_rows = zip(df[col].astype(str), df[col].astype(str))
+        # Arrow-backed strings, so the column-wise normalize/split below runs on
+        # pyarrow's kernels; a missing text maps like "" (as in map_text)
+        procs = df[col].astype(STRING_DTYPE).fillna("")
+        # Expect df to have 'raw_specialty' (original); otherwise treat the
+        # passed column as both original and processed
+        raws = df["raw_specialty"].astype(STRING_DTYPE) if "raw_specialty" in df.columns else procs
+
+        # Specialty feeds are highly repetitive: work on the distinct texts only.
+        # Normalize + split them column-wise into one row per sub-specialty,
+        # indexed by the position of its text in uniques (same steps as map_text).
+        uniques = pd.Series(procs.unique())
+        parts = normalize_series(uniques).str.split(_SPLIT_RE.pattern, regex=True).explode().str.strip()
+        parts = parts[parts.notna() & (parts != "")]
 
-        for raw_orig, proc_val in iter_rows:
-            codes, conf, reason = self.map_text(str(proc_val))
-            mapped = "|".join(codes) if codes else "JUNK"
-            rows.append((raw_orig, mapped, round(conf, 3), reason[:250]))
-        return pd.DataFrame(rows, columns=["raw_specialty", "mapped_code", "confidence", "explain"])
+        self.map_many_parallel(parts, n_jobs)
+        res = pd.DataFrame.from_dict(self.map_many(parts), orient="index", columns=["codes", "conf", "why"])
+        res = res.reindex(parts.to_numpy()).set_axis(parts.index)
+        res["reason"] = ("[" + parts.astype(object) + "]→" + res["codes"].str.join(",").replace("", "none")
+                         + "(" + res["conf"].map("{:.2f}".format) + ")")
+
+        # Top 3 codes per text by frequency, ties by first appearance (Counter.most_common)
+        hits = res["codes"].explode().dropna().rename("code").rename_axis("text").reset_index()
+        hits["pos"] = range(len(hits))
+        top = (
+            hits.groupby(["text", "code"], sort=False)
+            .agg(n=("pos", "size"), first=("pos", "min"))
+            .reset_index()
+            .sort_values(["text", "n", "first"], ascending=[True, False, True])
+            .groupby("text").head(3)
+            .groupby("text")["code"].agg("|".join)
+        )
+        by_text = res.groupby(level=0)
+        out = pd.DataFrame({
+            "mapped_code": top,
+            "confidence": by_text["conf"].mean(),
+            "explain": by_text["reason"].agg("; ".join).str.slice(0, 250),
+        }).reindex(range(len(uniques)))
+        # Texts without any code score 0; texts without any part explain nothing
+        out["confidence"] = out["confidence"].where(out["mapped_code"].notna(), 0.0).map(lambda c: round(c, 3))
+        out = out.fillna({"mapped_code": "JUNK", "explain": ""})
 
+        out = out.set_axis(uniques.to_numpy()).reindex(procs.to_numpy()).reset_index(drop=True)
+        out.insert(0, "raw_specialty", raws.to_numpy())
+        return out
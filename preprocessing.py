@@ -9,15 +9,50 @@ NO HARDCODED SYNONYMS — all expansions are read from your synonyms file.
 Output columns: raw_specialty, processed, is_junk (1/0)
 """
 
+import os
 import re
-import csv
 import argparse
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
 from html import unescape
 from typing import Tuple, Dict, List, Optional
 from pathlib import Path
 
 import pandas as pd
 
+from caching import cached, files_digest, library_versions
+
+try:
+    import pyarrow  # noqa: F401  (multi-threaded CSV parsing, Arrow-backed strings)
+    CSV_ENGINE = "pyarrow"
+    STRING_DTYPE = "string[pyarrow]"
+except ImportError:
+    CSV_ENGINE = "c"
+    STRING_DTYPE = "string"
+
+try:
+    import ahocorasick  # optional: one linear scan for all synonym phrases
+    USE_AHOCORASICK = True
+except ImportError:
+    USE_AHOCORASICK = False
+
+
+def backend_key() -> str:
+    """String dtype, synonym matcher and library versions behind the results, for cache keys."""
+    return (f"string_dtype={STRING_DTYPE};ahocorasick={USE_AHOCORASICK};"
+            + library_versions("pandas", "pyarrow", "pyahocorasick"))
+
+
+# Patterns applied per Python string (column headers, noise words, process_one)
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_NON_WORD_RE = re.compile(r"\W")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_WS_RE = re.compile(r"\s+")
+_DASH_RE = re.compile(r"[-–—]")
+_SEP_RUN_RE = re.compile(r"( / )+")
+_INPUT_COL_RE = re.compile(r"(special|dept|discipline|service|category|name)", re.I)
+
 
 def load_synonyms(path: str) -> Dict[str, str]:
     """
@@ -30,40 +65,72 @@ def load_synonyms(path: str) -> Dict[str, str]:
     p = Path(path)
     if not p.exists():
         raise FileNotFoundError(f"Synonyms file not found: {path}")
-    out: Dict[str, str] = {}
-    with open(p, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for r in reader:
-            typ = (r.get("type") or "").strip().lower()
-            pat = (r.get("pattern") or "").strip().lower()
-            rep = (r.get("replacement") or "").strip().lower()
-            if typ in {"abbreviation", "synonym"} and pat and rep and pat != rep:
-                out[_norm(pat)] = _norm(rep)
-    return out
-
-
-def _fix_mojibake(s: str) -> str:
-    replacements = {
-        "Ã¢â‚¬â€œ": "",
-        "ÃƒÂ¢Ã¢â€šÂ¬Ã¢â‚¬Å“": "",
-        "Ã¢â‚¬": "",
-        "Â": "",
-    }
-    for bad, good in replacements.items():
-        s = s.replace(bad, good)
-    return unescape(s)
+    df = pd.read_csv(p, engine=CSV_ENGINE, usecols=["type", "pattern", "replacement"],
+                     dtype=STRING_DTYPE, keep_default_na=False, encoding="utf-8")
+    # keep_default_na=False: empty cells are already "" rather than NA
+    typ, pat, rep = (df[c].str.strip().str.lower() for c in ("type", "pattern", "replacement"))
+    keep = typ.isin({"abbreviation", "synonym"}) & (pat != "") & (rep != "") & (pat != rep)
+    return dict(zip(_norm_series(pat[keep]), _norm_series(rep[keep])))
+
+
+_MOJIBAKE = {
+    "Ã¢â‚¬â€œ": "",
+    "ÃƒÂ¢Ã¢â€šÂ¬Ã¢â‚¬Å“": "",
+    "Ã¢â‚¬": "",
+    "Â": "",
+}
+
+
+# Every char Python's str.isspace() / re's \s accept, written out: on Arrow-backed
+# columns "\s" means RE2's ASCII-only class and str.strip() trims a different set.
+# A plain (not raw) string, so the pattern holds the characters themselves.
+_WS_CLASS = "[\t\n\x0b\x0c\r\x1c-\x1f \x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]"
+
+
+def _norm_series(s: pd.Series) -> pd.Series:
+    """Strip, undo common mojibake and HTML entities, collapse whitespace (str semantics)."""
+    s = s.str.replace(f"^{_WS_CLASS}+|{_WS_CLASS}+$", "", regex=True)
+    for bad, good in _MOJIBAKE.items():
+        s = s.str.replace(bad, good, regex=False)
+    # Only text with an "&" can hold an HTML entity
+    amp = s.str.contains("&", regex=False)
+    if amp.any():
+        s = s.copy()
+        s[amp] = s[amp].map(unescape).astype(s.dtype)
+    s = s.str.replace("\u00A0", " ", regex=False)
+    return s.str.replace(f"{_WS_CLASS}+", " ", regex=True)
 
 
 def _norm(s: str) -> str:
-    s = (s or "").strip()
-    s = _fix_mojibake(s)
-    s = s.replace("\u00A0", " ")
-    s = re.sub(r"\s+", " ", s)
-    return s
+    """_norm_series for a single str."""
+    s = s.strip()
+    for bad, good in _MOJIBAKE.items():
+        s = s.replace(bad, good)
+    if "&" in s:
+        s = unescape(s)
+    return _WS_RE.sub(" ", s.replace("\u00A0", " "))
+
+
+def _lower(s: pd.Series) -> pd.Series:
+    """s.str.lower(), but str.lower() on non-ASCII rows (Arrow maps e.g. "İ" to "i", not "i̇")."""
+    low = s.str.lower()
+    wide = s.str.contains(r"[^\x00-\x7f]", regex=True)
+    if wide.any():
+        low[wide] = s[wide].map(str.lower).astype(s.dtype)
+    return low
 
 
-def _to_lower_tokens(s: str) -> List[str]:
-    return [t for t in re.findall(r"[a-z0-9]+", s.lower()) if t]
+# Per-process preprocessor used by process_series workers
+_worker_pre: Optional["PreprocessSpecialty"] = None
+
+
+def _init_worker(pre: "PreprocessSpecialty") -> None:
+    global _worker_pre
+    _worker_pre = pre
+
+
+def _process_shard(texts: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    return _worker_pre._process_distinct(texts)
 
 
 class PreprocessSpecialty:
@@ -77,6 +144,9 @@ class PreprocessSpecialty:
     - HTML entities + common mojibake fix
     - NUCC code passthrough (e.g., 207RC0000X)
     - junk detection (placeholders, clearly non-medical)
+
+    Every step operates on a whole pandas Series, so each regex runs once
+    per column rather than once per row.
     """
 
     PLACEHOLDERS = {
@@ -87,6 +157,12 @@ class PreprocessSpecialty:
         "taxi", "ambulance", "driver", "contractor", "agency", "public", "sector",
         "admin", "accounts", "billing"
     }
+    MED_HINTS = {
+        "medicine", "surgery", "cardiology", "neurology", "dermatology", "radiology", "oncology",
+        "pediatrics", "psychiatry", "pathology", "anesthesiology", "urology", "nephrology",
+        "endocrinology", "gastroenterology", "hematology", "ophthalmology", "otolaryngology",
+        "rehabilitation", "genetics", "rheumatology", "pulmonology"
+    }
     ORG_NOISE = {
         "dept", "department", "division", "program", "service", "center", "centre",
         "unit", "office", "hospital", "clinic", "outpatient", "inpatient", "opd",
@@ -95,141 +171,296 @@ class PreprocessSpecialty:
     GEO_NOISE = {"usa", "us", "united", "states", "india", "canada", "uk", "united kingdom"}
     HONORIFICS = {"dr", "mr", "mrs", "ms", "prof", "md."}
     DIGIT_LETTER = str.maketrans({"0": "o", "1": "i", "3": "e", "5": "s", "7": "t", "8": "b"})
-    NUCC_CODE_RE = re.compile(r"\b[0-9A-Z]{9}X\b", re.I)
-    PARENS_RE = re.compile(r"\(([^)]+)\)")
+    # Column patterns are plain strings in the common subset of Python re and RE2
+    # (no lookarounds): on Arrow-backed columns pandas runs them with pyarrow's
+    # RE2 kernels, otherwise with re. Every text they see is ASCII by then.
+    NUCC_CODE_PAT = r"(?i)\b([0-9A-Z]{9}X)\b"
+    PARENS_PAT = r"\(([^)]+)\)"
+    # Three ASCII letters anywhere (texts matching nothing are too short to map)
+    MIN_LETTERS_PAT = r"[a-zA-Z][^a-zA-Z]*[a-zA-Z][^a-zA-Z]*[a-zA-Z]"
+    # Every multi-specialty connector in one alternation
+    SEPARATOR_PAT = r"(?i)\s*[&+,;/]\s*|\band\b"
+    # Whole-token matchers; tokens are [a-z0-9]+ runs of the lowercased text
+    NON_MEDICAL_PAT = r"(?:^|[^a-z0-9])(?:" + "|".join(sorted(NON_MEDICAL)) + r")(?:[^a-z0-9]|$)"
+    MED_HINT_PAT = r"(?:^|[^a-z0-9])(?:" + "|".join(sorted(MED_HINTS)) + r")(?:[^a-z0-9]|$)"
+    # The same patterns compiled for process_one's per-string path
+    _NUCC_CODE_RE = re.compile(NUCC_CODE_PAT)
+    _PARENS_RE = re.compile(PARENS_PAT)
+    _MIN_LETTERS_RE = re.compile(MIN_LETTERS_PAT)
+    _SEPARATOR_RE = re.compile(SEPARATOR_PAT)
+    _NON_MEDICAL_RE = re.compile(NON_MEDICAL_PAT)
+    _MED_HINT_RE = re.compile(MED_HINT_PAT)
 
     def __init__(self, synonyms_map: Dict[str, str]):
         """
         synonyms_map: normalized pattern -> normalized replacement (from your CSV)
         """
         self.syn_map = dict(synonyms_map)
-        # Precompile phrase patterns (multiword first) for boundary-safe replacement
-        pats = sorted(self.syn_map.keys(), key=len, reverse=True)
-        self._regexes: List[Tuple[re.Pattern, str]] = []
-        for pat in pats:
-            escaped = re.escape(pat)
-            rx = re.compile(rf"(?<!\w){escaped}(?!\w)")
-            self._regexes.append((rx, self.syn_map[pat]))
-
-    def _digits_to_letters(self, s: str) -> str:
-        def repl(m):
-            word = m.group(0)
-            if re.search(r"[0-9]", word):
-                return word.translate(self.DIGIT_LETTER)
-            return word
-        return re.sub(r"[A-Za-z0-9]+", repl, s)
-
-    def _strip_noise_tokens(self, s: str) -> str:
-        toks = _to_lower_tokens(s)
-        kept = []
-        for t in toks:
-            if t in self.HONORIFICS:  continue
-            if t in self.ORG_NOISE:   continue
-            if t in self.GEO_NOISE:   continue
-            kept.append(t)
-        return " ".join(kept)
-
-    def _standardize_separators(self, s: str) -> str:
-        s = re.sub(r"\s*&\s*", " / ", s)
-        s = re.sub(r"\s*\+\s*", " / ", s)
-        s = re.sub(r"\s*(,|;)\s*", " / ", s)
-        s = re.sub(r"\s*/\s*", " / ", s)
-        s = re.sub(r"\band\b", " / ", s, flags=re.I)
-        s = re.sub(r"( / )+", " / ", s)
+        # Phrases longest first (multiword before their parts); the matchers built
+        # from them (_syn_rx / _syn_ac) are compiled on first use only.
+        self._syn_pats = sorted(self.syn_map.keys(), key=len, reverse=True)
+        self._syn_lookup: Dict[str, str] = self.syn_map
+
+        # All noise words stripped in one regex pass. Entries that are not a single
+        # [a-z0-9]+ token ("united kingdom", "md.") can never equal a token, so skip them.
+        self._NOISE = frozenset(self.HONORIFICS | self.ORG_NOISE | self.GEO_NOISE)
+        words = sorted((w for w in self._NOISE if _TOKEN_RE.fullmatch(w)), key=len, reverse=True)
+        self._NOISE_PAT = r"\b(?:" + "|".join(words) + r")\b"
+        self._noise_re = re.compile(self._NOISE_PAT)
+
+        # process_one results, memoized since they are a pure function of the raw text
+        self._cache: Dict[str, Tuple[str, int]] = {}
+
+    @cached_property
+    def _syn_rx(self) -> Optional[re.Pattern]:
+        # One boundary-safe alternation over all phrases, so a single scan
+        # replaces every synonym; the lookup dispatches replacements.
+        if not self._syn_pats:
+            return None
+        alt = "|".join(re.escape(p) for p in self._syn_pats)
+        return re.compile(rf"(?<!\w)({alt})(?!\w)")
+
+    @cached_property
+    def _syn_ac(self):
+        # Same phrases in an Aho–Corasick automaton when available. It scans a copy
+        # of the text with every non-word char turned into "\0" and keys are
+        # "\0" + phrase + "\0", so the word boundaries are part of each match
+        # and mid-word hits of short abbreviations never come up. Phrases that
+        # differ only in non-word chars share a key: value = (length, phrases).
+        if not self._syn_pats or not USE_AHOCORASICK:
+            return None
+        keyed: Dict[str, List[str]] = {}
+        for p in self._syn_pats:
+            keyed.setdefault("\0" + _NON_WORD_RE.sub("\0", p) + "\0", []).append(p)
+        ac = ahocorasick.Automaton()
+        for key, phrases in keyed.items():
+            ac.add_word(key, (len(key) - 2, tuple(phrases)))
+        ac.make_automaton()
+        return ac
+
+    def _digits_to_letters(self, s: pd.Series) -> pd.Series:
+        # Every digit belongs to an alphanumeric word that contains a digit,
+        # so translating the whole string equals the per-word substitution.
+        # One literal replace per digit keeps it in the string kernels
+        # (str.translate is a Python call per row).
+        for digit, letter in self.DIGIT_LETTER.items():
+            s = s.str.replace(chr(digit), letter, regex=False)
         return s
 
-    def _clean_parentheses(self, s: str) -> str:
-        s = self.PARENS_RE.sub(lambda m: " " + m.group(1), s)
-        s = re.sub(r"\s+", " ", s).strip()
-        return s
+    def _strip_noise_tokens(self, s: pd.Series) -> pd.Series:
+        s = _lower(s).str.replace(r"[^a-z0-9]+", " ", regex=True)
+        s = s.str.replace(self._NOISE_PAT, " ", regex=True)
+        return s.str.replace(r"\s+", " ", regex=True).str.strip()
 
-    def _normalize_punct_case(self, s: str) -> str:
-        s = s.lower()
-        s = re.sub(r"[-–—]", " ", s)
-        s = re.sub(r"\s+", " ", s).strip()
+    def _standardize_separators(self, s: pd.Series) -> pd.Series:
+        s = s.str.replace(self.SEPARATOR_PAT, " / ", regex=True)
+        s = s.str.replace(r"( / )+", " / ", regex=True)
         return s
 
-    def _apply_synonyms(self, s: str) -> str:
-        if not self._regexes:
-            return s
-        out = s
-        for rx, repl in self._regexes:
-            out = rx.sub(repl, out)
-        out = re.sub(r"\s+", " ", out).strip()
-        return out
+    def _clean_parentheses(self, s: pd.Series) -> pd.Series:
+        # Spacing is left to _strip_noise_tokens, which rewrites every
+        # non-alphanumeric run to a single space anyway
+        return s.str.replace(self.PARENS_PAT, r" \1", regex=True)
 
-    def _select_primary_text(self, s: str) -> str:
-        m = self.NUCC_CODE_RE.search(s.upper())
-        if m:
-            return m.group(0).upper()
+    def _normalize_punct_case(self, s: pd.Series) -> pd.Series:
+        s = s.str.lower()
+        s = s.str.replace(r"[-–—]", " ", regex=True)
+        s = s.str.replace(r"\s+", " ", regex=True).str.strip()
         return s
 
-    def _is_placeholder_or_empty(self, s: str) -> bool:
-        return s.lower() in self.PLACEHOLDERS or s.strip() == ""
-
-    def _is_non_medical(self, s: str) -> bool:
-        toks = _to_lower_tokens(s)
-        if not toks:
-            return True
-        nm = sum(t in self.NON_MEDICAL for t in toks)
-        med_hint = any(t in {
-            "medicine","surgery","cardiology","neurology","dermatology","radiology","oncology",
-            "pediatrics","psychiatry","pathology","anesthesiology","urology","nephrology",
-            "endocrinology","gastroenterology","hematology","ophthalmology","otolaryngology",
-            "rehabilitation","genetics","rheumatology","pulmonology"
-        } for t in toks)
-        return bool(nm and not med_hint)
+    def _replace_synonyms(self, text: str) -> str:
+        """
+        self._syn_rx.sub for one string, driven by the automaton: leftmost match
+        wins, the longest phrase among equal starts, both ends on a word boundary.
+        """
+        scan = "\0" + _NON_WORD_RE.sub("\0", text) + "\0"
+        hits = []
+        for end, (size, phrases) in self._syn_ac.iter(scan):
+            start = end - size - 1  # key's trailing "\0" at end, scan offset by one
+            if any(text.startswith(p, start) for p in phrases):
+                hits.append((start, start + size))
+        if not hits:
+            return text
+        hits.sort(key=lambda h: (h[0], -h[1]))
+        out, pos = [], 0
+        for start, end in hits:
+            if start < pos:
+                continue
+            out.append(text[pos:start])
+            out.append(self._syn_lookup[text[start:end]])
+            pos = end
+        out.append(text[pos:])
+        return "".join(out)
+
+    def _apply_synonyms(self, s: pd.Series) -> pd.Series:
+        if not self._syn_pats:
+            return s
+        if self._syn_ac is not None:
+            if s.empty:
+                return s
+            # One automaton scan over the whole column: whitespace is already
+            # collapsed, so "\n" never occurs in a row and acts as a boundary.
+            out = self._replace_synonyms("\n".join(s.tolist())).split("\n")
+            s = pd.Series(out, index=s.index, dtype=s.dtype)
+        else:
+            s = s.str.replace(self._syn_rx, lambda m: self._syn_lookup[m.group(0)], regex=True)
+        s = s.str.replace(r"\s+", " ", regex=True).str.strip()
+        return s
 
-    def process_one(self, raw: str) -> Tuple[str, int]:
-        orig = "" if pd.isna(raw) else str(raw)
-        s = _norm(orig)
-        if self._is_placeholder_or_empty(s):
-            return ("junk", 1)
+    def _select_primary_text(self, s: pd.Series) -> pd.Series:
+        code = s.str.upper().str.extract(self.NUCC_CODE_PAT, expand=False)
+        return code.fillna(s)
+
+    def _is_placeholder_or_empty(self, s: pd.Series) -> pd.Series:
+        # Whitespace is collapsed by now, so only "" and " " are blank
+        return _lower(s).isin(self.PLACEHOLDERS) | s.isin(["", " "])
+
+    def _is_non_medical(self, s: pd.Series) -> pd.Series:
+        low = _lower(s)
+        nm = low.str.contains(self.NON_MEDICAL_PAT, regex=True)
+        # Only the (rare) non-medical hits need the medical-hint check
+        nm[nm] = ~low[nm].str.contains(self.MED_HINT_PAT, regex=True)
+        return nm
+
+    def _process_distinct(self, s: pd.Series) -> Tuple[pd.Series, pd.Series]:
+        """The pipeline over distinct, non-missing raw texts. Returns (processed, flagged)."""
+        s = _norm_series(s)
+        junk = self._is_placeholder_or_empty(s)
         s = self._clean_parentheses(s)
         s = self._digits_to_letters(s)
         s = self._strip_noise_tokens(s)
-        if not s:
-            return ("junk", 1)
+        junk |= s == ""
         s = self._standardize_separators(s)
         s = self._normalize_punct_case(s)
-        s = self._apply_synonyms(s)  # ONLY file-driven synonyms here
-        s = re.sub(r"\s+", " ", s).strip()
+        s = self._apply_synonyms(s)  # ONLY file-driven synonyms here; leaves spacing normalized
         s = self._select_primary_text(s)
-        if self._is_non_medical(s) or len(re.sub(r"[^a-zA-Z]+", "", s)) < 3:
-            return (s if s else "junk", 1)
-        return (s, 0)
+        # Fewer than 3 letters; also covers texts without any alphanumeric token
+        too_short = ~s.str.contains(self.MIN_LETTERS_PAT, regex=True)
+        flagged = junk | too_short | self._is_non_medical(s)
+        processed = s.where(~junk & (s != ""), "junk")
+        return processed, flagged.astype(int)
+
+    def process_series(self, raw: pd.Series, n_jobs: int = 1) -> Tuple[pd.Series, pd.Series]:
+        """
+        Vectorized pipeline over a Series of raw specialties.
+        n_jobs: worker processes for the distinct values (1 = in-process, -1 = all cores).
+        Returns (processed, is_junk) aligned with the input index.
+        """
+        raw = raw.astype(STRING_DTYPE).fillna("")
+        # Specialty columns repeat heavily: run the pipeline on the distinct
+        # values only and take the results back out per row at the end
+        codes, uniques = pd.factorize(raw)
+        uniques = pd.Series(uniques, dtype=STRING_DTYPE)
+        if n_jobs < 0:
+            n_jobs = os.cpu_count() or 1
+        n_shards = min(len(uniques), n_jobs * 4)
+        if n_jobs <= 1 or n_shards <= 1:
+            processed, flagged = self._process_distinct(uniques)
+        else:
+            # Contiguous shards, so concatenating the results keeps the factorized order
+            step = -(-len(uniques) // n_shards)
+            shards = [uniques.iloc[i:i + step] for i in range(0, len(uniques), step)]
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(self,)) as pool:
+                results = list(pool.map(_process_shard, shards))
+            processed = pd.concat([r[0] for r in results])
+            flagged = pd.concat([r[1] for r in results])
+        return (processed.take(codes).set_axis(raw.index),
+                flagged.take(codes).set_axis(raw.index))
+
+    def _process_text(self, raw) -> Tuple[str, int]:
+        """_process_distinct for one raw value, with re on a plain str (no pandas)."""
+        s = _norm("" if pd.isna(raw) else str(raw))
+        if s.lower() in self.PLACEHOLDERS or not s.strip():
+            return ("junk", 1)
+        s = self._PARENS_RE.sub(r" \1", s).translate(self.DIGIT_LETTER)
+        s = self._noise_re.sub(" ", _NON_ALNUM_RE.sub(" ", s.lower()))
+        s = _WS_RE.sub(" ", s).strip()
+        if not s:
+            return ("junk", 1)
+        s = _SEP_RUN_RE.sub(" / ", self._SEPARATOR_RE.sub(" / ", s))
+        s = _WS_RE.sub(" ", _DASH_RE.sub(" ", s.lower())).strip()
+        if self._syn_pats:
+            if self._syn_ac is not None:
+                s = self._replace_synonyms(s)
+            else:
+                s = self._syn_rx.sub(lambda m: self._syn_lookup[m.group(0)], s)
+            s = _WS_RE.sub(" ", s).strip()
+        code = self._NUCC_CODE_RE.search(s.upper())
+        if code:
+            s = code.group(1)
+        low = s.lower()
+        flagged = (not self._MIN_LETTERS_RE.search(s)
+                   or (self._NON_MEDICAL_RE.search(low) is not None
+                       and not self._MED_HINT_RE.search(low)))
+        return (s or "junk", int(flagged))
+
+    def process_one(self, raw: str) -> Tuple[str, int]:
+        """process_series for a single value, memoized per raw str (repeats are a dict lookup)."""
+        if not isinstance(raw, str):
+            return self._process_text(raw)
+        out = self._cache.get(raw)
+        if out is None:
+            out = self._cache[raw] = self._process_text(raw)
+        return out
+
+    def __getstate__(self):
+        # process_one's cache is derived data; don't ship it to worker processes
+        state = self.__dict__.copy()
+        state["_cache"] = {}
+        return state
 
-    def process_dataframe(self, df: pd.DataFrame, col_guess: Optional[str] = None) -> pd.DataFrame:
+    def process_dataframe(self, df: pd.DataFrame, col_guess: Optional[str] = None,
+                          cache_dir: Optional[str] = None, n_jobs: int = 1) -> pd.DataFrame:
+        """
+        cache_dir: if set, the result is stored there as parquet, keyed by the
+        column's contents, the synonyms, this module's code and backend_key().
+        n_jobs: worker processes (see process_series).
+        """
         if col_guess is None:
-            candidates = [c for c in df.columns
-                          if re.search(r"(special|dept|discipline|service|category|name)", c, re.I)]
-            col_guess = candidates[0] if candidates else df.columns[0]
-        rows = []
-        for raw in df[col_guess].astype(str).tolist():
-            processed, junk = self.process_one(raw)
-            rows.append((raw, processed, junk))
-        return pd.DataFrame(rows, columns=["raw_specialty", "processed", "is_junk"])
+            col_guess = detect_input_column(df)
+        raw = df[col_guess].astype(STRING_DTYPE).reset_index(drop=True)
+
+        def build() -> pd.DataFrame:
+            processed, is_junk = self.process_series(raw, n_jobs=n_jobs)
+            return pd.DataFrame({
+                "raw_specialty": raw,
+                "processed": processed,
+                "is_junk": is_junk.astype("int8"),
+            })
+
+        if cache_dir is None:
+            return build()
+        data = hashlib.blake2b(pd.util.hash_pandas_object(raw, index=False).to_numpy().tobytes(),
+                               digest_size=16).hexdigest()
+        key = files_digest(__file__, extra=f"data={data};synonyms={sorted(self.syn_map.items())!r};{backend_key()}")
+        return cached(Path(cache_dir).expanduser(), f"pre-{key}", build)
 
 
 def detect_input_column(df: pd.DataFrame) -> str:
-    cands = [c for c in df.columns
-             if re.search(r"(special|dept|discipline|service|category|name)", c, re.I)]
+    cands = [c for c in df.columns if _INPUT_COL_RE.search(c)]
     return cands[0] if cands else df.columns[0]
 
 
+def read_input(path: str) -> Tuple[pd.DataFrame, str]:
+    """Read only the specialty column of an input CSV. Returns (df, column)."""
+    col = detect_input_column(pd.read_csv(path, nrows=0))
+    return pd.read_csv(path, engine=CSV_ENGINE, usecols=[col], dtype={col: STRING_DTYPE}), col
+
+
 def main():
     ap = argparse.ArgumentParser(description="Preprocess provider specialties (synonyms only from file).")
     ap.add_argument("--input", required=True, help="Path to input_specialties.csv")
     ap.add_argument("--out", required=True, help="Path to write preprocessed_specialties.csv")
     ap.add_argument("--synonyms", required=True, help="Path to synonyms CSV (type,pattern,replacement)")
+    ap.add_argument("--cache-dir", default=None, help="Reuse/store the result here (parquet, content-keyed)")
+    ap.add_argument("--jobs", type=int, default=1, help="Worker processes (-1 = all cores)")
     args = ap.parse_args()
 
     syn = load_synonyms(args.synonyms)
     pre = PreprocessSpecialty(synonyms_map=syn)
 
-    df_in = pd.read_csv(args.input)
-    col = detect_input_column(df_in)
-    df_out = pre.process_dataframe(df_in, col_guess=col)
+    df_in, col = read_input(args.input)
+    df_out = pre.process_dataframe(df_in, col_guess=col, cache_dir=args.cache_dir, n_jobs=args.jobs)
 
     Path(args.out).parent.mkdir(parents=True, exist_ok=True)
     df_out.to_csv(args.out, index=False)